@@ -1,7 +1,19 @@
 import ctypes
-import json
 from pprint import pprint
 
+try:
+    import orjson
+
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    import json
+
+    def json_dumps(value):
+        return json.dumps(value).encode("utf8")
+
+    json_loads = json.loads
+
 lib = ctypes.CDLL("./target/debug/libcrosslocale.so")
 
 
@@ -65,9 +77,11 @@ for request_index, request in enumerate(
 ):
     message_json = {"type": "req", "id": request_index + 1, "data": request}
     pprint(message_json, sort_dicts=False)
-    message = json.dumps(message_json)
+    message_bytes = json_dumps(message_json)
 
-    message_buf = (ctypes.c_uint8 * len(message))(*(message.encode("utf8")))
+    # from_buffer_copy does a single memcpy, unlike passing the bytes as
+    # constructor arguments which boxes every byte into a Python int.
+    message_buf = (ctypes.c_uint8 * len(message_bytes)).from_buffer_copy(message_bytes)
     lib.crosslocale_backend_send_message(backend, message_buf, len(message_buf))
 
     out_message = ctypes.POINTER(ctypes.c_uint8)()
@@ -80,11 +94,13 @@ for request_index, request in enumerate(
             ctypes.byref(out_message_len),
             ctypes.byref(out_message_cap),
         )
-        message = ctypes.string_at(out_message, out_message_len.value).decode("utf8")
+        # Both JSON parsers accept UTF-8 bytes, so there is no need to decode
+        # the message into an intermediate str.
+        message_bytes = ctypes.string_at(out_message, out_message_len.value)
     finally:
         lib.crosslocale_message_free(out_message, out_message_len, out_message_cap)
 
-    message_json = json.loads(message)
+    message_json = json_loads(message_bytes)
     pprint(message_json, sort_dicts=False)
 
 lib.crosslocale_backend_free(backend)
@@ -13,9 +13,14 @@ pub mod status;
 
 use crate::impl_prelude::*;
 use crate::progress::ProgressReporter;
+use crate::utils;
 
-use std::collections::HashMap;
-use std::path::PathBuf;
+use std::collections::{HashMap, HashSet};
+use std::fs;
+use std::io::{self, Read};
+use std::ops::Deref;
+use std::path::{Path, PathBuf};
+use std::sync::mpsc;
 
 #[derive(Debug)]
 pub struct GlobalOpts {
@@ -108,6 +113,113 @@ impl GlobalOpts {
   }
 }
 
+/// Capacity of the buffered writers used for the exported files. Most
+/// translation packs fit into it completely and are written out with a single
+/// syscall instead of one per every 8 KiB of the default capacity.
+pub const EXPORT_WRITER_BUFFER_SIZE: usize = 1 << 20;
+
+/// Contents of a file loaded with [`read_file_bytes`], either memory-mapped or
+/// read into a buffer depending on the [`MmapPreference`].
+#[derive(Debug)]
+pub enum FileBytes {
+  Mapped(memmap2::Mmap),
+  Read(Vec<u8>),
+}
+
+impl Deref for FileBytes {
+  type Target = [u8];
+  fn deref(&self) -> &Self::Target {
+    match self {
+      Self::Mapped(mmap) => mmap,
+      Self::Read(vec) => vec,
+    }
+  }
+}
+
+pub fn read_file_bytes(path: &Path, mmap_preference: MmapPreference) -> io::Result<FileBytes> {
+  let mut use_mmap = false;
+  if let MmapPreference::Auto = mmap_preference {
+    // <https://github.com/BurntSushi/ripgrep/blob/0958837ee104985412f08e81b6f08df1e5291042/src/worker.rs#L353-L360>
+    if path.metadata()?.len() > 0 {
+      use_mmap = true;
+    }
+  }
+
+  let mut file = fs::File::open(path)?;
+  Ok(if use_mmap {
+    FileBytes::Mapped(unsafe { memmap2::MmapOptions::new().populate().map(&file)? })
+  } else {
+    // The files are always consumed from start to end, so let the kernel know
+    // that it may read ahead more aggressively. This is only a hint, hence the
+    // errors are ignored.
+    #[cfg(any(target_os = "linux", target_os = "android"))]
+    unsafe {
+      use std::os::unix::io::AsRawFd;
+      libc::posix_fadvise(file.as_raw_fd(), 0, 0, libc::POSIX_FADV_SEQUENTIAL);
+    }
+    // Same as what fs::read does internally.
+    let mut bytes = Vec::with_capacity(file.metadata().map_or(0, |m| m.len() as usize + 1));
+    file.read_to_end(&mut bytes)?;
+    FileBytes::Read(bytes)
+  })
+}
+
+/// Writes out files on a thread pool, so that the calling thread can go on
+/// with serializing the next ones in the meantime. Errors are collected and
+/// the first one is returned by [`ParallelFileWriter::finish`].
+#[derive(Debug)]
+pub struct ParallelFileWriter {
+  pool: threadpool::ThreadPool,
+  errors_tx: mpsc::Sender<AnyError>,
+  errors_rx: mpsc::Receiver<AnyError>,
+  created_dirs: HashSet<PathBuf>,
+}
+
+impl ParallelFileWriter {
+  /// Zero `jobs` means using as many threads as there are CPU cores available.
+  pub fn new(jobs: usize) -> Self {
+    let mut builder = threadpool::Builder::new();
+    if jobs != 0 {
+      builder = builder.num_threads(jobs);
+    }
+    let (errors_tx, errors_rx) = mpsc::channel();
+    Self { pool: builder.build(), errors_tx, errors_rx, created_dirs: HashSet::new() }
+  }
+
+  /// Writes `bytes` to `path` in the background. The parent directories are
+  /// created right away on the calling thread, but only once per directory,
+  /// since typically there are many files and just a few directories.
+  pub fn write(&mut self, path: PathBuf, bytes: Vec<u8>) -> AnyResult<()> {
+    if let Some(parent) = path.parent() {
+      if !self.created_dirs.contains(parent) {
+        utils::create_dir_recursively(parent)
+          .with_context(|| format!("Failed to create the parent directories for {:?}", path))?;
+        self.created_dirs.insert(parent.to_owned());
+      }
+    }
+
+    let errors_tx = self.errors_tx.clone();
+    self.pool.execute(move || {
+      if let Err(e) = fs::write(&path, &bytes) {
+        // The writer may have already been dropped without calling finish if
+        // the calling thread has bailed out because of its own error.
+        let e = AnyError::new(e).context(format!("Failed to write file {:?}", path));
+        let _ = errors_tx.send(e);
+      }
+    });
+    Ok(())
+  }
+
+  pub fn finish(self) -> AnyResult<()> {
+    self.pool.join();
+    drop(self.errors_tx);
+    match self.errors_rx.into_iter().next() {
+      Some(e) => Err(e),
+      None => Ok(()),
+    }
+  }
+}
+
 assert_trait_is_object_safe!(Command);
 pub trait Command {
   fn name(&self) -> &'static str;
@@ -14,6 +14,7 @@ use std::fs;
 use std::io::{self, Write};
 use std::path::{Path, PathBuf};
 use std::rc::Rc;
+use std::str::FromStr;
 
 #[derive(Debug)]
 pub struct ConvertCommand;
@@ -158,13 +159,25 @@ impl super::Command for ConvertCommand {
             Note that this will mean different things depending on the output format.",
           ),
       )
+      .arg(
+        clap::Arg::new("jobs")
+          .short('j')
+          .long("jobs")
+          .about(
+            "The number of parallel worker threads allocated for reading the input files and \
+            writing the output ones. Zero means using as many threads as there are CPU cores \
+            available.",
+          )
+          .validator(|s| usize::from_str(s).map(|_| ()))
+          .default_value("0"),
+      )
   }
 
   fn run(
     &self,
-    _global_opts: super::GlobalOpts,
+    global_opts: super::GlobalOpts,
     matches: &clap::ArgMatches,
-    _progress: Box<dyn ProgressReporter>,
+    mut progress: Box<dyn ProgressReporter>,
   ) -> AnyResult<()> {
     let opt_scan_db = PathBuf::from(matches.value_of_os("scan_db").unwrap());
     let opt_original_locale = matches.value_of("original_locale");
@@ -181,10 +194,11 @@ impl super::Command for ConvertCommand {
     let opt_mapping_output = matches.value_of_os("mapping_output").map(PathBuf::from);
     let opt_mapping_lm_paths = matches.is_present("mapping_lm_paths");
     let opt_compact = matches.is_present("compact");
+    let opt_jobs = usize::from_str(matches.value_of("jobs").unwrap()).unwrap();
 
     info!("Converting files from {:?} to {:?}", opt_input_format, opt_output_format);
 
-    let mut importer =
+    let importer =
       importers::create_by_id(&opt_input_format).context("Failed to create the importer")?;
     let mut exporter =
       exporters::create(&opt_output_format, exporters::ExporterConfig { compact: opt_compact })
@@ -202,25 +216,23 @@ impl super::Command for ConvertCommand {
 
     let inputs = super::import::collect_input_files(&opt_inputs, &opt_inputs_file, &*importer)?;
 
-    let inputs_len = inputs.len();
-    for (i, input_path) in inputs.into_iter().enumerate() {
-      trace!("[{}/{}] {:?}", i + 1, inputs_len, input_path);
-
-      let input = fs::read_to_string(&*input_path)
-        .with_context(|| format!("Failed to read file {:?}", input_path))?;
-      let mut imported_fragments = Vec::new();
-      importer
-        .import(&input_path, &input, &mut imported_fragments)
-        .with_context(|| format!("Failed to import file {:?}", input_path))?;
-
-      for imported_fragment in imported_fragments {
-        let fragments_in_import_file = all_imported_fragments
-          .entry(imported_fragment.file_path.share_rc())
-          .or_insert_with(Vec::new);
-        fragments_in_import_file.push((input_path.share_rc(), imported_fragment));
-        total_imported_fragments_count += 1;
-      }
-    }
+    super::import::import_input_files(
+      &inputs,
+      &*importer,
+      global_opts.mmap_preference,
+      opt_jobs,
+      &mut *progress,
+      |input_path: &Rc<PathBuf>, imported_fragments: Vec<ImportedFragment>| -> AnyResult<()> {
+        for imported_fragment in imported_fragments {
+          let fragments_in_import_file = all_imported_fragments
+            .entry(imported_fragment.file_path.share_rc())
+            .or_insert_with(Vec::new);
+          fragments_in_import_file.push((input_path.share_rc(), imported_fragment));
+          total_imported_fragments_count += 1;
+        }
+        Ok(())
+      },
+    )?;
 
     info!("Imported {} fragments", total_imported_fragments_count);
 
@@ -360,7 +372,8 @@ impl super::Command for ConvertCommand {
     };
     let mut export_fragments_to_file =
       |path: &Path, fragments: &[ExportedFragment]| -> AnyResult<()> {
-        let mut writer = io::BufWriter::new(
+        let mut writer = io::BufWriter::with_capacity(
+          super::EXPORT_WRITER_BUFFER_SIZE,
           fs::File::create(&path)
             .with_context(|| format!("Failed to open file {:?} for writing", path))?,
         );
@@ -370,17 +383,21 @@ impl super::Command for ConvertCommand {
       };
 
     if splitter.is_some() {
+      // The exporters and fragments aren't thread-safe, so the serialization
+      // is done on this thread and only the writing is handed off.
+      let mut file_writer = super::ParallelFileWriter::new(opt_jobs);
       for (export_file_path, fragments) in &fragments_by_export_path {
         if fragments.is_empty() {
           continue;
         }
         let export_file_path = opt_output.join(export_file_path);
-        utils::create_dir_recursively(export_file_path.parent().unwrap()).with_context(|| {
-          format!("Failed to create the parent directories for {:?}", export_file_path)
+        let mut bytes = Vec::new();
+        exporter.export(&exported_meta, fragments, &mut bytes).with_context(|| {
+          format!("Failed to export all fragments to file {:?}", export_file_path)
         })?;
-        export_fragments_to_file(&export_file_path, fragments)
-          .with_context(|| format!("Failed to export all fragments to file {:?}", opt_output))?;
+        file_writer.write(export_file_path, bytes)?;
       }
+      file_writer.finish()?;
 
       info!(
         "Converted {} fragments to {} files",
@@ -12,6 +12,7 @@ use indexmap::IndexMap;
 use std::fs;
 use std::io::{self, Write};
 use std::path::{Path, PathBuf};
+use std::str::FromStr;
 
 #[derive(Debug)]
 pub struct ExportCommand;
@@ -97,6 +98,17 @@ impl super::Command for ExportCommand {
             Note that this will mean different things depending on the output format.",
           ),
       )
+      .arg(
+        clap::Arg::new("jobs")
+          .short('j')
+          .long("jobs")
+          .about(
+            "The number of parallel worker threads allocated for writing the exported files. \
+            Zero means using as many threads as there are CPU cores available.",
+          )
+          .validator(|s| usize::from_str(s).map(|_| ()))
+          .default_value("0"),
+      )
   }
 
   fn run(
@@ -113,6 +125,7 @@ impl super::Command for ExportCommand {
     let opt_mapping_output = matches.value_of_os("mapping_output").map(PathBuf::from);
     let opt_mapping_lm_paths = matches.is_present("mapping_lm_paths");
     let opt_compact = matches.is_present("compact");
+    let opt_jobs = usize::from_str(matches.value_of("jobs").unwrap()).unwrap();
 
     info!(
       "Exporting a translation project in {:?} as {:?} into {:?}",
@@ -200,7 +213,8 @@ impl super::Command for ExportCommand {
     let exported_meta = exporters::ExportedProjectMeta::new(project.meta());
     let mut export_fragments_to_file =
       |path: &Path, fragments: &[ExportedFragment]| -> AnyResult<()> {
-        let mut writer = io::BufWriter::new(
+        let mut writer = io::BufWriter::with_capacity(
+          super::EXPORT_WRITER_BUFFER_SIZE,
           fs::File::create(&path)
             .with_context(|| format!("Failed to open file {:?} for writing", path))?,
         );
@@ -210,17 +224,21 @@ impl super::Command for ExportCommand {
       };
 
     if splitter.is_some() {
+      // The exporters and fragments aren't thread-safe, so the serialization
+      // is done on this thread and only the writing is handed off.
+      let mut file_writer = super::ParallelFileWriter::new(opt_jobs);
       for (export_file_path, fragments) in &fragments_by_export_path {
         if fragments.is_empty() {
           continue;
         }
         let export_file_path = opt_output.join(export_file_path);
-        utils::create_dir_recursively(export_file_path.parent().unwrap()).with_context(|| {
-          format!("Failed to create the parent directories for {:?}", export_file_path)
+        let mut bytes = Vec::new();
+        exporter.export(&exported_meta, fragments, &mut bytes).with_context(|| {
+          format!("Failed to export all fragments to file {:?}", export_file_path)
         })?;
-        export_fragments_to_file(&export_file_path, fragments)
-          .with_context(|| format!("Failed to export all fragments to file {:?}", opt_output))?;
+        file_writer.write(export_file_path, bytes)?;
       }
+      file_writer.finish()?;
 
       info!(
         "Exported {} fragments to {} files",
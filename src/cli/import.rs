@@ -1,6 +1,7 @@
+use crate::cli::MmapPreference;
 use crate::impl_prelude::*;
 use crate::progress::ProgressReporter;
-use crate::project::importers;
+use crate::project::importers::{self, ImportedFragment};
 use crate::project::{self, Project, Translation};
 use crate::rc_string::RcString;
 use crate::utils;
@@ -11,6 +12,9 @@ use std::fs;
 use std::io::{self, BufRead};
 use std::path::PathBuf;
 use std::rc::Rc;
+use std::str::{self, FromStr};
+use std::sync::atomic::{AtomicBool, Ordering};
+use std::sync::{mpsc, Arc};
 
 #[derive(Debug)]
 pub struct ImportCommand;
@@ -111,13 +115,24 @@ impl super::Command for ImportCommand {
           .number_of_values(1)
           .about("Add flags to the imported translations."),
       )
+      .arg(
+        clap::Arg::new("jobs")
+          .short('j')
+          .long("jobs")
+          .about(
+            "The number of parallel worker threads allocated for reading the input files. Zero \
+            means using as many threads as there are CPU cores available.",
+          )
+          .validator(|s| usize::from_str(s).map(|_| ()))
+          .default_value("0"),
+      )
   }
 
   fn run(
     &self,
-    _global_opts: super::GlobalOpts,
+    global_opts: super::GlobalOpts,
     matches: &clap::ArgMatches,
-    _progress: Box<dyn ProgressReporter>,
+    mut progress: Box<dyn ProgressReporter>,
   ) -> AnyResult<()> {
     let opt_project_dir = PathBuf::from(matches.value_of_os("project_dir").unwrap());
     let opt_inputs: Vec<_> = matches
@@ -132,6 +147,7 @@ impl super::Command for ImportCommand {
     let opt_add_flags: HashSet<_> = matches
       .values_of("add_flags")
       .map_or_else(HashSet::new, |values| values.map(RcString::from).collect());
+    let opt_jobs = usize::from_str(matches.value_of("jobs").unwrap()).unwrap();
 
     info!(
       "Importing into a translation project in {:?} from {:?}",
@@ -140,116 +156,114 @@ impl super::Command for ImportCommand {
     );
 
     let project = Project::open(opt_project_dir).context("Failed to open the project")?;
-    let mut importer =
+    let importer =
       importers::create_by_id(&opt_format).context("Failed to create the importer")?;
     let mut total_imported_fragments_count = 0;
 
     let inputs = collect_input_files(&opt_inputs, &opt_inputs_file, &*importer)?;
+    import_input_files(
+      &inputs,
+      &*importer,
+      global_opts.mmap_preference,
+      opt_jobs,
+      &mut *progress,
+      |input_path: &Rc<PathBuf>, imported_fragments: Vec<ImportedFragment>| -> AnyResult<()> {
+        for imported_fragment in imported_fragments {
+          let fragment = if let Some(v) = project
+            .get_virtual_game_file(&imported_fragment.file_path)
+            .and_then(|virt_file| virt_file.get_fragment(&imported_fragment.json_path))
+          {
+            v
+          } else {
+            warn!(
+              "Import {:?}:\n\
+              fragment {:?} {:?}: not found in the project",
+              input_path, imported_fragment.file_path, imported_fragment.json_path,
+            );
+            continue;
+          };
 
-    let inputs_len = inputs.len();
-    for (i, input_path) in inputs.into_iter().enumerate() {
-      trace!("[{}/{}] {:?}", i + 1, inputs_len, input_path);
+          if *fragment.original_text() != imported_fragment.original_text {
+            warn!(
+              "Import {:?}:\n\
+              fragment {:?} {:?}: stale original text, translation are likely outdated",
+              input_path, imported_fragment.file_path, imported_fragment.json_path,
+            );
+          }
 
-      let input = fs::read_to_string(&*input_path)
-        .with_context(|| format!("Failed to read file {:?}", input_path))?;
-      let mut imported_fragments = Vec::new();
-      importer
-        .import(&input_path, &input, &mut imported_fragments)
-        .with_context(|| format!("Failed to import file {:?}", input_path))?;
-
-      for imported_fragment in imported_fragments {
-        let fragment = if let Some(v) = project
-          .get_virtual_game_file(&imported_fragment.file_path)
-          .and_then(|virt_file| virt_file.get_fragment(&imported_fragment.json_path))
-        {
-          v
-        } else {
-          warn!(
-            "Import {:?}:\n\
-            fragment {:?} {:?}: not found in the project",
-            input_path, imported_fragment.file_path, imported_fragment.json_path,
-          );
-          continue;
-        };
-
-        if *fragment.original_text() != imported_fragment.original_text {
-          warn!(
-            "Import {:?}:\n\
-            fragment {:?} {:?}: stale original text, translation are likely outdated",
-            input_path, imported_fragment.file_path, imported_fragment.json_path,
-          );
-        }
+          if opt_delete_other_translations {
+            fragment.clear_translations();
+          }
 
-        if opt_delete_other_translations {
-          fragment.clear_translations();
-        }
+          if opt_always_add_new_translations {
+            fragment.reserve_additional_translations(imported_fragment.translations.len());
+          }
 
-        if opt_always_add_new_translations {
-          fragment.reserve_additional_translations(imported_fragment.translations.len());
-        }
+          let mut remaining_existing_translations: Option<Vec<Rc<Translation>>> = None;
+          for imported_translation in imported_fragment.translations {
+            let imported_translation_author = imported_translation
+              .author_username
+              .unwrap_or_else(|| opt_default_author.share_rc());
+            let imported_translation_editor = imported_translation
+              .editor_username
+              .unwrap_or_else(|| imported_translation_author.share_rc());
 
-        let mut remaining_existing_translations: Option<Vec<Rc<Translation>>> = None;
-        for imported_translation in imported_fragment.translations {
-          let imported_translation_author =
-            imported_translation.author_username.unwrap_or_else(|| opt_default_author.share_rc());
-          let imported_translation_editor = imported_translation
-            .editor_username
-            .unwrap_or_else(|| imported_translation_author.share_rc());
-
-          let existing_translation = if !opt_always_add_new_translations {
-            let remaining_existing_translations = remaining_existing_translations
-              .get_or_insert_with(|| fragment.translations().to_owned());
-
-            remaining_existing_translations
-              .iter()
-              .position(|tr| {
-                tr.has_flag(&opt_marker_flag)
-                  && *tr.author_username() == imported_translation_author
-              })
-              .map(|existing_translation_i: usize| -> Rc<Translation> {
-                remaining_existing_translations.remove(existing_translation_i)
-              })
-          } else {
-            None
-          };
+            let existing_translation = if !opt_always_add_new_translations {
+              let remaining_existing_translations = remaining_existing_translations
+                .get_or_insert_with(|| fragment.translations().to_owned());
 
-          let timestamp = utils::get_timestamp();
+              remaining_existing_translations
+                .iter()
+                .position(|tr| {
+                  tr.has_flag(&opt_marker_flag)
+                    && *tr.author_username() == imported_translation_author
+                })
+                .map(|existing_translation_i: usize| -> Rc<Translation> {
+                  remaining_existing_translations.remove(existing_translation_i)
+                })
+            } else {
+              None
+            };
 
-          if let Some(existing_translation) = existing_translation {
-            existing_translation.set_modification_timestamp(
-              imported_translation.modification_timestamp.unwrap_or(timestamp),
-            );
-            existing_translation.set_text(imported_translation.text);
-            for flag in imported_translation.flags.into_iter() {
-              existing_translation.add_flag(flag);
-            }
-            for flag in &opt_add_flags {
-              existing_translation.add_flag(flag.share_rc());
+            let timestamp = utils::get_timestamp();
+
+            if let Some(existing_translation) = existing_translation {
+              existing_translation.set_modification_timestamp(
+                imported_translation.modification_timestamp.unwrap_or(timestamp),
+              );
+              existing_translation.set_text(imported_translation.text);
+              for flag in imported_translation.flags.into_iter() {
+                existing_translation.add_flag(flag);
+              }
+              for flag in &opt_add_flags {
+                existing_translation.add_flag(flag.share_rc());
+              }
+            } else {
+              let mut flags =
+                HashSet::with_capacity(1 + imported_translation.flags.len() + opt_add_flags.len());
+              flags.insert(opt_marker_flag.share_rc());
+              flags.extend(imported_translation.flags.into_iter());
+              flags.extend(opt_add_flags.iter().cloned());
+
+              fragment.new_translation(project::TranslationInitOpts {
+                id: utils::new_uuid(),
+                author_username: imported_translation_author,
+                editor_username: imported_translation_editor,
+                creation_timestamp: timestamp,
+                modification_timestamp: imported_translation
+                  .modification_timestamp
+                  .unwrap_or(timestamp),
+                text: imported_translation.text,
+                flags: Rc::new(flags),
+              });
             }
-          } else {
-            let mut flags =
-              HashSet::with_capacity(1 + imported_translation.flags.len() + opt_add_flags.len());
-            flags.insert(opt_marker_flag.share_rc());
-            flags.extend(imported_translation.flags.into_iter());
-            flags.extend(opt_add_flags.iter().cloned());
-
-            fragment.new_translation(project::TranslationInitOpts {
-              id: utils::new_uuid(),
-              author_username: imported_translation_author,
-              editor_username: imported_translation_editor,
-              creation_timestamp: timestamp,
-              modification_timestamp: imported_translation
-                .modification_timestamp
-                .unwrap_or(timestamp),
-              text: imported_translation.text,
-              flags: Rc::new(flags),
-            });
           }
-        }
 
-        total_imported_fragments_count += 1;
-      }
-    }
+          total_imported_fragments_count += 1;
+        }
+        Ok(())
+      },
+    )?;
 
     info!("Imported {} fragments", total_imported_fragments_count);
 
@@ -300,3 +314,110 @@ pub fn collect_input_files(
 
   Ok(input_files)
 }
+
+/// Reads and parses the input files on a thread pool, a separate importer
+/// instance is created for every file. The callback is invoked on the calling
+/// thread with the imported fragments of every file in the same order as the
+/// inputs, as soon as the file and all of the preceding ones have been parsed,
+/// so that the processing of the results overlaps with parsing of the rest.
+pub fn import_input_files(
+  inputs: &[Rc<PathBuf>],
+  importer: &dyn importers::Importer,
+  mmap_preference: MmapPreference,
+  jobs: usize,
+  progress: &mut dyn ProgressReporter,
+  mut callback: impl FnMut(&Rc<PathBuf>, Vec<ImportedFragment>) -> AnyResult<()>,
+) -> AnyResult<()> {
+  let inputs_len = inputs.len();
+  progress.begin_task(inputs_len)?;
+  progress.set_task_info(&RcString::from("<Starting...>"))?;
+  progress.set_task_progress(0)?;
+
+  let pool: threadpool::ThreadPool = {
+    let mut builder = threadpool::Builder::new();
+    if jobs != 0 {
+      builder = builder.num_threads(jobs);
+    }
+    builder.build()
+  };
+
+  #[derive(Debug)]
+  struct TaskResult {
+    task_index: usize,
+    imported_fragments: AnyResult<Vec<ImportedFragment>>,
+  }
+
+  let (results_tx, results_rx) = mpsc::channel::<Box<TaskResult>>();
+  let importer_id: &'static str = importer.id();
+  // Set when the import fails to let the workers skip the remaining queued
+  // files instead of parsing them only for the results to be thrown away.
+  let cancelled = Arc::new(AtomicBool::new(false));
+
+  for (task_index, input_path) in inputs.iter().enumerate() {
+    let results_tx = results_tx.clone();
+    let input_path = PathBuf::clone(input_path);
+    let cancelled = cancelled.clone();
+
+    pool.execute(move || {
+      if cancelled.load(Ordering::Relaxed) {
+        return;
+      }
+
+      let imported_fragments = try_any_result!({
+        let mut importer = importers::create_by_id(importer_id)?;
+        let input_bytes = super::read_file_bytes(&input_path, mmap_preference)
+          .with_context(|| format!("Failed to read file {:?}", input_path))?;
+        let input = str::from_utf8(&input_bytes)
+          .with_context(|| format!("Failed to decode file {:?} as UTF-8", input_path))?;
+        let mut imported_fragments = Vec::new();
+        importer
+          .import(&input_path, input, &mut imported_fragments)
+          .with_context(|| format!("Failed to import file {:?}", input_path))?;
+        imported_fragments
+      });
+
+      // The receiving side hangs up early when an error is returned for one
+      // of the preceding files, the remaining results are of no use then.
+      let _ = results_tx.send(Box::new(TaskResult { task_index, imported_fragments }));
+    });
+  }
+
+  // Drop the main instance from which all others have been cloned, to allow
+  // the receiving side to exit without deadlocks.
+  drop(results_tx);
+
+  // Results which have arrived ahead of some of the preceding ones are held
+  // here until the gap is filled.
+  let mut pending_results =
+    Vec::<Option<AnyResult<Vec<ImportedFragment>>>>::with_capacity(inputs_len);
+  for _ in 0..inputs_len {
+    pending_results.push(None);
+  }
+  let mut next_task_index: usize = 0;
+
+  let result = try_any_result!({
+    for (i, task_result) in results_rx.into_iter().enumerate() {
+      let input_path = &inputs[task_result.task_index];
+      trace!("[{}/{}] {:?}", i + 1, inputs_len, input_path);
+      progress.set_task_info(&RcString::from(input_path.to_string_lossy()))?;
+      progress.set_task_progress(i + 1)?;
+      pending_results[task_result.task_index] = Some(task_result.imported_fragments);
+
+      while let Some(result) = pending_results.get_mut(next_task_index).and_then(Option::take) {
+        callback(&inputs[next_task_index], result?)?;
+        next_task_index += 1;
+      }
+    }
+  });
+  if result.is_err() {
+    cancelled.store(true, Ordering::Relaxed);
+    return result;
+  }
+
+  progress.set_task_progress(inputs_len)?;
+  pool.join();
+  progress.end_task()?;
+
+  assert_eq!(next_task_index, inputs_len);
+  Ok(())
+}
@@ -6,9 +6,9 @@ use crate::utils::json;
 use crate::utils::parsing::ParsingError;
 
 use std::borrow::Cow;
-use std::fs;
 use std::io::{self, Read, Write};
 use std::path::PathBuf;
+use std::str;
 
 #[derive(Debug)]
 pub struct ParsePoCommand;
@@ -28,28 +28,32 @@ impl super::Command for ParsePoCommand {
 
   fn run(
     &self,
-    _global_opts: super::GlobalOpts,
+    global_opts: super::GlobalOpts,
     matches: &clap::ArgMatches,
     _progress: Box<dyn ProgressReporter>,
   ) -> AnyResult<()> {
     let opt_file = matches.value_of_os("file").map(PathBuf::from);
     let opt_json = matches.is_present("json");
 
-    let (src, filename): (String, Cow<str>) = match &opt_file {
-      Some(file) => (fs::read_to_string(file)?, file.to_string_lossy()),
+    let (src_bytes, filename): (super::FileBytes, Cow<str>) = match &opt_file {
+      Some(file) => {
+        (super::read_file_bytes(file, global_opts.mmap_preference)?, file.to_string_lossy())
+      }
       None => {
-        let mut buf = String::new();
-        io::stdin().read_to_string(&mut buf)?;
-        (buf, "<stdin>".into())
+        let mut buf = Vec::new();
+        io::stdin().read_to_end(&mut buf)?;
+        (super::FileBytes::Read(buf), "<stdin>".into())
       }
     };
+    let src = str::from_utf8(&src_bytes)
+      .with_context(|| format!("Failed to decode {} as UTF-8", filename))?;
 
-    let iter = gettext_po::parse(&src).filter_map(
+    let iter = gettext_po::parse(src).filter_map(
       |message: Result<ParsedMessage, ParsingError>| -> Option<ParsedMessage> {
         match message {
           Ok(message) => Some(message),
           Err(e) => {
-            error!("{}", e.nice_formatter(&filename, &src));
+            error!("{}", e.nice_formatter(&filename, src));
             None
           }
         }
@@ -83,18 +87,19 @@ fn print_messages_json<'src>(iter: impl Iterator<Item = ParsedMessage<'src>>) ->
     add_comments("reference_comments", &message.reference_comments);
     add_comments("flags_comments", &message.flags_comments);
 
-    let mut add_section = |name: &'static str, strings: &[Cow<str>]| {
-      let joined_string = utils::fast_concat_cow(strings);
-      if !joined_string.is_empty() {
-        message_obj.insert(name.to_owned(), json::Value::String(joined_string));
+    let mut add_section = |name: &'static str, string: Option<Cow<str>>| {
+      if let Some(string) = string {
+        if !string.is_empty() {
+          message_obj.insert(name.to_owned(), json::Value::String(string.into_owned()));
+        }
       }
     };
 
-    add_section("prev_msgctxt", &message.prev_msgctxt);
-    add_section("prev_msgid", &message.prev_msgid);
-    add_section("msgctxt", &message.msgctxt);
-    add_section("msgid", &message.msgid);
-    add_section("msgstr", &message.msgstr);
+    add_section("prev_msgctxt", message.prev_msgctxt);
+    add_section("prev_msgid", message.prev_msgid);
+    add_section("msgctxt", message.msgctxt);
+    add_section("msgid", Some(message.msgid));
+    add_section("msgstr", Some(message.msgstr));
 
     let message_obj = json::Value::Object(message_obj);
 
@@ -129,12 +134,12 @@ fn print_messages_po<'src>(iter: impl Iterator<Item = ParsedMessage<'src>>) -> A
     print_comments("#,", &message.flags_comments);
 
     let print_section =
-      |prefix: &'static str, keyword: &'static str, text_strings: &[Cow<str>]| {
-        if text_strings.is_empty() {
-          return;
-        }
-        let mut joined_string = String::new();
-        let text_strings = resplit_po_string(text_strings, &mut joined_string);
+      |prefix: &'static str, keyword: &'static str, joined_string: Option<&str>| {
+        let joined_string = match joined_string {
+          Some(v) => v,
+          None => return,
+        };
+        let text_strings: Vec<&str> = utils::LinesWithEndings::new(joined_string).collect();
 
         fn quote_string(string: &str) -> String { serde_json::to_string(string).unwrap() }
 
@@ -152,17 +157,12 @@ fn print_messages_po<'src>(iter: impl Iterator<Item = ParsedMessage<'src>>) -> A
         }
       };
 
-    print_section("#| ", "msgctxt", &message.prev_msgctxt);
-    print_section("#| ", "msgid", &message.prev_msgid);
-    print_section("", "msgctxt", &message.msgctxt);
-    print_section("", "msgid", &message.msgid);
-    print_section("", "msgstr", &message.msgstr);
+    print_section("#| ", "msgctxt", message.prev_msgctxt.as_deref());
+    print_section("#| ", "msgid", message.prev_msgid.as_deref());
+    print_section("", "msgctxt", message.msgctxt.as_deref());
+    print_section("", "msgid", Some(&*message.msgid));
+    print_section("", "msgstr", Some(&*message.msgstr));
   }
 
   Ok(())
 }
-
-fn resplit_po_string<'a>(strings: &[Cow<str>], out_joined_string: &'a mut String) -> Vec<&'a str> {
-  *out_joined_string = utils::fast_concat_cow(strings);
-  utils::LinesWithEndings::new(out_joined_string).collect()
-}
@@ -406,25 +406,7 @@ fn is_lang_label_ignored(lang_label: &LangLabel, found_file: &FoundJsonFile) ->
 }
 
 pub fn read_json_file(path: &Path, mmap_preference: MmapPreference) -> io::Result<json::Value> {
-  let mut use_mmap = false;
-  if let MmapPreference::Auto = mmap_preference {
-    // <https://github.com/BurntSushi/ripgrep/blob/0958837ee104985412f08e81b6f08df1e5291042/src/worker.rs#L353-L360>
-    if path.metadata()?.len() > 0 {
-      use_mmap = true;
-    }
-  }
-
-  let bytes_mmap: memmap2::Mmap;
-  let bytes_non_mmap: Vec<u8>;
-  let bytes: &[u8] = if use_mmap {
-    let file = fs::File::open(path)?;
-    bytes_mmap = unsafe { memmap2::MmapOptions::new().populate().map(&file)? };
-    &bytes_mmap
-  } else {
-    bytes_non_mmap = fs::read(path)?;
-    &bytes_non_mmap
-  };
-
-  let value = serde_json::from_slice(bytes)?;
+  let bytes = super::read_file_bytes(path, mmap_preference)?;
+  let value = serde_json::from_slice(&bytes)?;
   Ok(value)
 }
@@ -1,14 +1,16 @@
 use crate::rc_string::RcString;
-use crate::utils::parsing::{CharPos, CharPosIter, ParsingError};
+use crate::utils::parsing::{find_any_byte, CharPos, ParsingError};
 
 use std::borrow::Cow;
-use std::iter;
 use std::str;
 
 #[derive(Debug, Clone, PartialEq, Eq)]
 pub struct Token<'src> {
-  pub start_pos: CharPos,
-  pub end_pos: CharPos,
+  /// Byte range of the token in the source. [`CharPos`]itions are not stored
+  /// because they are needed only for reporting errors, and can be recovered
+  /// from these indexes with [`CharPos::find_in`].
+  pub start_index: usize,
+  pub end_index: usize,
   pub type_: TokenType<'src>,
 }
 
@@ -35,36 +37,40 @@ pub enum CommentType {
 #[derive(Debug)]
 pub struct Lexer<'src> {
   src: &'src str,
-  src_iter: iter::Peekable<CharPosIter<'src>>,
   done: bool,
-  token_start_pos: CharPos,
-  current_pos: CharPos,
+  token_start_index: usize,
   next_char_index: usize,
-  is_previous_entry: bool,
+  /// Index of the newline which ends the line with the last encountered `#|`
+  /// marker, the tokens which end before it belong to the previous entry.
+  previous_entry_line_end_index: usize,
 }
 
 impl<'src> Lexer<'src> {
   pub fn new(src: &'src str) -> Self {
     Self {
       src,
-      src_iter: CharPosIter::new(src).peekable(),
       done: false,
-      token_start_pos: CharPos::default(),
-      current_pos: CharPos::default(),
+      token_start_index: 0,
       next_char_index: 0,
-      is_previous_entry: false,
+      previous_entry_line_end_index: 0,
     }
   }
 
+  #[inline(always)]
+  fn remaining_bytes(&self) -> &'src [u8] { &self.src.as_bytes()[self.next_char_index..] }
+
+  /// Consumes the next `len` bytes of the source, which must end on a char
+  /// boundary. Positions (lines and columns) are deliberately not tracked
+  /// here, instead the few places which need them compute those from byte
+  /// indexes with [`CharPos::find_in`], this way the scanning functions below
+  /// can skip whole runs of characters at once.
+  #[inline(always)]
+  fn consume(&mut self, len: usize) { self.next_char_index += len; }
+
   fn next_char(&mut self) -> Option<char> {
-    match self.src_iter.next() {
-      Some((chr_pos, chr)) => {
-        self.current_pos = chr_pos;
-        self.next_char_index = chr_pos.byte_index + chr.len_utf8();
-        // HACK: Honestly, this should be handled by the main match block.
-        if chr == '\n' {
-          self.reset_current_line_flags();
-        }
+    match self.src[self.next_char_index..].chars().next() {
+      Some(chr) => {
+        self.consume(chr.len_utf8());
         Some(chr)
       }
       None => {
@@ -74,50 +80,68 @@ impl<'src> Lexer<'src> {
     }
   }
 
-  fn peek_char(&mut self) -> Option<char> {
-    let &(_chr_pos, chr) = self.src_iter.peek()?;
-    Some(chr)
-  }
+  #[inline(always)]
+  fn peek_byte(&self) -> Option<u8> { self.remaining_bytes().first().copied() }
 
-  fn begin_token(&mut self) { self.token_start_pos = self.current_pos; }
+  #[inline(always)]
+  pub fn src(&self) -> &'src str { self.src }
+
+  fn begin_token(&mut self) { self.token_start_index = self.next_char_index; }
   fn end_token(&self, type_: TokenType<'src>) -> Token<'src> {
-    Token {
-      start_pos: self.token_start_pos,
-      end_pos: CharPos {
-        byte_index: self.next_char_index,
-        char_index: self.current_pos.char_index + 1,
-        column: self.current_pos.column + 1,
-        line: self.current_pos.line,
-      },
-      type_,
-    }
+    Token { start_index: self.token_start_index, end_index: self.next_char_index, type_ }
   }
 
   fn emit_error(&mut self, message: String) -> Result<!, ParsingError> {
     self.done = true;
-    Err(ParsingError { pos: self.current_pos, message: RcString::from(message) })
+    // Errors are reported at the last consumed character.
+    let consumed_src = &self.src[..self.next_char_index];
+    let pos = match consumed_src.chars().next_back() {
+      Some(c) => CharPos::find_in(self.src, self.next_char_index - c.len_utf8()),
+      None => CharPos::default(),
+    };
+    Err(ParsingError { pos, message: RcString::from(message) })
   }
 
-  fn reset_current_line_flags(&mut self) { self.is_previous_entry = false; }
+  #[inline(always)]
+  fn is_previous_entry(&self) -> bool {
+    self.next_char_index <= self.previous_entry_line_end_index
+  }
 
   pub fn parse_next_token(&mut self) -> Result<Option<Token<'src>>, ParsingError> {
     while !self.done {
       self.skip_whitespace();
+      self.begin_token();
 
       // NOTE: This is the only place where quick return when no more tokens
       // are available is permitted, all other calls of `next_char` must handle
       // the EOF and emit an error or something like that.
-      let c = match self.next_char() {
-        Some(c) => c,
-        None => return Ok(None),
+      let first_byte = match self.peek_byte() {
+        Some(b) => b,
+        None => {
+          self.done = true;
+          return Ok(None);
+        }
       };
-      self.begin_token();
 
-      let token_type = match c {
-        '#' => self.parse_comment()?,
-        '\"' => self.parse_string()?,
-        _ if c.is_ascii_alphabetic() || c == '_' => self.parse_keyword()?,
-        _ => self.emit_error(format!("unexpected character {:?}", c))?,
+      // All characters which may begin a token are ASCII, so the dispatch is
+      // done on the first byte without decoding the character.
+      let token_type = match first_byte {
+        b'#' => {
+          self.consume(1);
+          self.parse_comment()?
+        }
+        b'\"' => {
+          self.consume(1);
+          self.parse_string()?
+        }
+        _ if char_has_class(first_byte, CHAR_CLASS_KEYWORD_START) => {
+          self.consume(1);
+          self.parse_keyword()?
+        }
+        _ => {
+          let c = self.next_char().unwrap();
+          self.emit_error(format!("unexpected character {:?}", c))?
+        }
       };
 
       if let Some(token_type) = token_type {
@@ -129,42 +153,39 @@ impl<'src> Lexer<'src> {
   }
 
   fn skip_whitespace(&mut self) {
-    while self.peek_char().map_or(false, |c| {
-      // Note that is_ascii_whitespace doesn't match \v which GNU gettext
-      // considers whitespace
-      matches!(c, '\t' | '\n' | /* \v */ '\x0B' | /* \f */ '\x0C' | '\r' | ' ')
-    }) {
-      self.next_char();
-    }
+    let bytes = self.remaining_bytes();
+    let len = bytes.iter().position(|&b| !char_has_class(b, CHAR_CLASS_WHITESPACE));
+    self.consume(len.unwrap_or(bytes.len()));
   }
 
   fn parse_comment(&mut self) -> Result<Option<TokenType<'src>>, ParsingError> {
-    match self.peek_char() {
-      Some('~') => {
-        self.next_char();
+    match self.peek_byte() {
+      Some(b'~') => {
+        self.consume(1);
         self.emit_error("obsolete entries are unsupported".to_owned())?;
       }
 
-      Some('|') => {
-        self.next_char();
-        self.is_previous_entry = true;
+      Some(b'|') => {
+        self.consume(1);
+        let line_len = find_any_byte(self.remaining_bytes(), [b'\n']);
+        self.previous_entry_line_end_index =
+          self.next_char_index + line_len.unwrap_or(self.src.len() - self.next_char_index);
         Ok(None)
       }
 
       marker_char => {
         let comment_type = match marker_char {
-          Some('.') => CommentType::Automatic,
-          Some(':') => CommentType::Reference,
-          Some(',') => CommentType::Flags,
+          Some(b'.') => CommentType::Automatic,
+          Some(b':') => CommentType::Reference,
+          Some(b',') => CommentType::Flags,
           _ => CommentType::Translator,
         };
         if comment_type != CommentType::Translator {
-          self.next_char();
+          self.consume(1);
         }
         let text_start_index = self.next_char_index;
-        while self.peek_char().map_or(false, |c| c != '\n') {
-          self.next_char();
-        }
+        let bytes = self.remaining_bytes();
+        self.consume(find_any_byte(bytes, [b'\n']).unwrap_or(bytes.len()));
         let text = &self.src[text_start_index..self.next_char_index];
         Ok(Some(TokenType::Comment(comment_type, Cow::Borrowed(text))))
       }
@@ -177,40 +198,52 @@ impl<'src> Lexer<'src> {
     let mut text_buf: Option<String> = None;
 
     loop {
-      let c = match self.peek_char() {
-        None | Some('\n') => self.emit_error("unterminated string".to_owned())?,
-        Some(c) => c,
-      };
-      self.next_char();
-      match c {
-        '\"' => break,
+      // Jump straight to the next character which has any special meaning
+      // inside a string literal, everything before it is copied verbatim.
+      let bytes = self.remaining_bytes();
+      let special_char_offset = find_any_byte(bytes, [b'\"', b'\\', b'\n']);
+      match special_char_offset.map(|offset| (offset, bytes[offset])) {
+        None | Some((_, b'\n')) => {
+          self.consume(special_char_offset.unwrap_or(bytes.len()));
+          self.emit_error("unterminated string".to_owned())?;
+        }
 
-        '\\' => {
-          let literal_text = &self.src[literal_text_start_index..self.current_pos.byte_index];
-          let c = match self.peek_char() {
+        Some((offset, b'\"')) => {
+          self.consume(offset + 1);
+          break;
+        }
+
+        Some((offset, _)) => {
+          self.consume(offset + 1);
+          // Excludes the backslash which has just been consumed.
+          let literal_text = &self.src[literal_text_start_index..self.next_char_index - 1];
+          let escaped_byte = match self.peek_byte() {
             None => self.emit_error("expected a character to escape".to_owned())?,
-            Some(c) => c,
+            Some(b) => b,
           };
-          self.next_char();
-
-          let unescaped_char = match c {
-            '\n' => None,
-            _ => Some(match c {
-              'n' => '\n',
-              't' => '\t',
-              'b' => '\x08',
-              'r' => '\r',
-              'f' => '\x0C',
-              'v' => '\x0B',
-              'a' => '\x07',
-              '\\' | '\"' => c,
+
+          let unescaped_char = match UNESCAPE_TABLE[escaped_byte as usize] {
+            __ => {
               // TODO: octal (optional), hex and unicode escape sequences
-              _ => self.emit_error(format!("unknown escaped character {:?}", c))?,
-            }),
+              let c = self.next_char().unwrap();
+              self.emit_error(format!("unknown escaped character {:?}", c))?
+            }
+            LC => None,
+            unescaped_byte => Some(unescaped_byte as char),
           };
+          self.consume(1);
 
+          let remaining_bytes = self.remaining_bytes();
           let text_buf = text_buf.get_or_insert_with(|| {
-            String::with_capacity(literal_text.len() + unescaped_char.map_or(0, char::len_utf8))
+            // Escape sequences only shrink when unescaped, so the rest of the
+            // current line is an upper bound on the size of the remaining
+            // text, unless the string is continued on the next line. This way
+            // the buffer is almost always allocated only once.
+            let rest_of_line_len =
+              find_any_byte(remaining_bytes, [b'\n']).unwrap_or(remaining_bytes.len());
+            String::with_capacity(
+              literal_text.len() + unescaped_char.map_or(0, char::len_utf8) + rest_of_line_len,
+            )
           });
           text_buf.push_str(literal_text);
           if let Some(unescaped_char) = unescaped_char {
@@ -218,12 +251,11 @@ impl<'src> Lexer<'src> {
           }
           literal_text_start_index = self.next_char_index;
         }
-
-        _ => {}
       }
     }
 
-    let last_literal_text = &self.src[literal_text_start_index..self.current_pos.byte_index];
+    // Excludes the closing quote.
+    let last_literal_text = &self.src[literal_text_start_index..self.next_char_index - 1];
     let text_cow = match text_buf {
       Some(mut text_buf) => {
         text_buf.push_str(last_literal_text);
@@ -232,19 +264,19 @@ impl<'src> Lexer<'src> {
       None => Cow::Borrowed(last_literal_text),
     };
 
-    Ok(Some(match self.is_previous_entry {
+    Ok(Some(match self.is_previous_entry() {
       false => TokenType::String(text_cow),
       true => TokenType::PrevString(text_cow),
     }))
   }
 
   fn parse_keyword(&mut self) -> Result<Option<TokenType<'src>>, ParsingError> {
-    while self.peek_char().map_or(false, |c| c.is_ascii_alphanumeric() || c == '_') {
-      self.next_char();
-    }
-    let keyword = &self.src[self.token_start_pos.byte_index..self.next_char_index];
+    let bytes = self.remaining_bytes();
+    let len = bytes.iter().position(|&b| !char_has_class(b, CHAR_CLASS_KEYWORD));
+    self.consume(len.unwrap_or(bytes.len()));
+    let keyword = &self.src[self.token_start_index..self.next_char_index];
 
-    Ok(Some(match (self.is_previous_entry, keyword) {
+    Ok(Some(match (self.is_previous_entry(), keyword) {
       (false, "domain") => self.emit_error(
         "the \"domain\" keyword is unsupported due to the lack of documentation about it"
           .to_owned(),
@@ -263,6 +295,74 @@ impl<'src> Lexer<'src> {
   }
 }
 
+const CHAR_CLASS_WHITESPACE: u8 = 1 << 0;
+const CHAR_CLASS_KEYWORD: u8 = 1 << 1;
+const CHAR_CLASS_KEYWORD_START: u8 = 1 << 2;
+
+#[inline(always)]
+fn char_has_class(b: u8, class: u8) -> bool { CHAR_CLASS_TABLE[b as usize] & class != 0 }
+
+const WS: u8 = CHAR_CLASS_WHITESPACE;
+const KW: u8 = CHAR_CLASS_KEYWORD;
+const KS: u8 = CHAR_CLASS_KEYWORD | CHAR_CLASS_KEYWORD_START;
+const __: u8 = 0;
+
+/// Lookup table of the character classes used by the scanning loops of the
+/// lexer. Note that is_ascii_whitespace doesn't match \v which GNU gettext
+/// considers whitespace, so it is included here.
+static CHAR_CLASS_TABLE: [u8; 1 << 8] = [
+  //   1   2   3   4   5   6   7   8   9   A   B   C   D   E   F
+  __, __, __, __, __, __, __, __, __, WS, WS, WS, WS, WS, __, __, // 0
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // 1
+  WS, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // 2
+  KW, KW, KW, KW, KW, KW, KW, KW, KW, KW, __, __, __, __, __, __, // 3
+  __, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, // 4
+  KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, __, __, __, __, KS, // 5
+  __, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, // 6
+  KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, KS, __, __, __, __, __, // 7
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // 8
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // 9
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // A
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // B
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // C
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // D
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // E
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // F
+];
+
+const AA: u8 = 0x07; // a
+const BB: u8 = 0x08; // b
+const TT: u8 = 0x09; // t
+const NN: u8 = 0x0A; // n
+const VV: u8 = 0x0B; // v
+const FF: u8 = 0x0C; // f
+const RR: u8 = 0x0D; // r
+const QU: u8 = b'"'; // "
+const BS: u8 = b'\\'; // \
+const LC: u8 = 0xFF; // a newline, i.e. line continuation
+
+/// Maps the characters which may follow a backslash to the ones they are
+/// replaced with.
+static UNESCAPE_TABLE: [u8; 1 << 8] = [
+  //   1   2   3   4   5   6   7   8   9   A   B   C   D   E   F
+  __, __, __, __, __, __, __, __, __, __, LC, __, __, __, __, __, // 0
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // 1
+  __, __, QU, __, __, __, __, __, __, __, __, __, __, __, __, __, // 2
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // 3
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // 4
+  __, __, __, __, __, __, __, __, __, __, __, __, BS, __, __, __, // 5
+  __, AA, BB, __, __, __, FF, __, __, __, __, __, __, __, NN, __, // 6
+  __, __, RR, __, TT, __, VV, __, __, __, __, __, __, __, __, __, // 7
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // 8
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // 9
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // A
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // B
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // C
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // D
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // E
+  __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, __, // F
+];
+
 impl<'src> Iterator for Lexer<'src> {
   type Item = Result<Token<'src>, ParsingError>;
 
@@ -1,9 +1,8 @@
-use super::lexer::{CommentType, Lexer, TokenType};
+use super::lexer::{CommentType, Lexer, Token, TokenType};
 use crate::rc_string::RcString;
 use crate::utils::parsing::{CharPos, ParsingError};
 
 use std::borrow::Cow;
-use std::iter;
 
 #[derive(Debug)]
 pub struct ParsedMessage<'src> {
@@ -11,71 +10,97 @@ pub struct ParsedMessage<'src> {
   pub automatic_comments: Vec<Cow<'src, str>>,
   pub reference_comments: Vec<Cow<'src, str>>,
   pub flags_comments: Vec<Cow<'src, str>>,
-  pub prev_msgctxt: Vec<Cow<'src, str>>,
-  pub prev_msgid: Vec<Cow<'src, str>>,
-  pub msgctxt: Vec<Cow<'src, str>>,
-  pub msgid: Vec<Cow<'src, str>>,
-  pub msgstr: Vec<Cow<'src, str>>,
+  // The sections below are stored already joined from all of their strings,
+  // the optional ones are `None` if they are absent from the message.
+  pub prev_msgctxt: Option<Cow<'src, str>>,
+  pub prev_msgid: Option<Cow<'src, str>>,
+  pub msgctxt: Option<Cow<'src, str>>,
+  pub msgid: Cow<'src, str>,
+  pub msgstr: Cow<'src, str>,
 }
 
 #[derive(Debug)]
 pub struct Parser<'src> {
-  lexer: iter::Peekable<Lexer<'src>>,
+  lexer: Lexer<'src>,
+  src: &'src str,
   done: bool,
-  current_token_start_pos: CharPos,
-  current_token_end_pos: CharPos,
+  /// A single-token lookahead slot, `None` means that nothing has been peeked
+  /// yet, `Some(None)` means that the lexer has reached the end of the input.
+  peeked_token: Option<Option<Token<'src>>>,
+  current_token_span: Option<(usize, usize)>,
 }
 
 impl<'src> Parser<'src> {
   pub fn new(lexer: Lexer<'src>) -> Self {
-    Self {
-      lexer: lexer.peekable(),
-      done: false,
-      current_token_start_pos: CharPos::default(),
-      current_token_end_pos: CharPos::default(),
+    Self { src: lexer.src(), lexer, done: false, peeked_token: None, current_token_span: None }
+  }
+
+  fn lex_next_token(&mut self) -> Result<Option<Token<'src>>, ParsingError> {
+    let result = self.lexer.parse_next_token();
+    if !matches!(result, Ok(Some(_))) {
+      self.done = true;
     }
+    result
   }
 
   fn next_token(&mut self) -> Result<Option<TokenType<'src>>, ParsingError> {
-    match self.lexer.next() {
-      Some(Ok(token)) => {
-        self.current_token_start_pos = token.start_pos;
-        self.current_token_end_pos = token.end_pos;
-        Ok(Some(token.type_))
-      }
-      Some(Err(error)) => {
-        self.done = true;
-        Err(error)
-      }
-      None => {
-        self.done = true;
-        Ok(None)
-      }
-    }
+    let token = match self.peeked_token.take() {
+      Some(token) => token,
+      None => self.lex_next_token()?,
+    };
+    Ok(token.map(|token| {
+      self.current_token_span = Some((token.start_index, token.end_index));
+      token.type_
+    }))
   }
 
   fn peek_token(&mut self) -> Result<Option<&TokenType<'src>>, ParsingError> {
-    match self.lexer.peek() {
-      Some(Ok(token)) => Ok(Some(&token.type_)),
-      Some(Err(error)) => {
-        self.done = true;
-        Err(error.clone())
-      }
-      None => {
-        self.done = true;
-        Ok(None)
-      }
+    if self.peeked_token.is_none() {
+      self.peeked_token = Some(self.lex_next_token()?);
+    }
+    Ok(self.peeked_token.as_ref().unwrap().as_ref().map(|token| &token.type_))
+  }
+
+  /// Consumes the next token only if it matches the predicate, this saves the
+  /// loops over lists of tokens of the same type from having to both peek the
+  /// next token and match it again after taking it.
+  fn next_token_if(
+    &mut self,
+    predicate: impl FnOnce(&TokenType<'src>) -> bool,
+  ) -> Result<Option<TokenType<'src>>, ParsingError> {
+    match self.peek_token()? {
+      Some(token_type) if predicate(token_type) => self.next_token(),
+      _ => Ok(None),
     }
   }
 
   fn emit_error(&mut self, message: String) -> Result<!, ParsingError> {
     self.done = true;
-    Err(ParsingError { pos: self.current_token_start_pos, message: RcString::from(message) })
+    let pos = match self.current_token_span {
+      Some((start_index, _)) => CharPos::find_in(self.src, start_index),
+      None => CharPos::default(),
+    };
+    Err(ParsingError { pos, message: RcString::from(message) })
   }
 
   fn emit_error_after(&mut self, message: String) -> Result<!, ParsingError> {
     self.done = true;
-    Err(ParsingError { pos: self.current_token_end_pos, message: RcString::from(message) })
+    let pos = match self.current_token_span {
+      Some((_, end_index)) => {
+        // Point right after the last character of the token, tokens never end
+        // with a newline, so this is always on the same line.
+        let last_char_len = self.src[..end_index].chars().next_back().map_or(0, char::len_utf8);
+        let last_char_pos = CharPos::find_in(self.src, end_index - last_char_len);
+        CharPos {
+          byte_index: end_index,
+          char_index: last_char_pos.char_index + 1,
+          line: last_char_pos.line,
+          column: last_char_pos.column + 1,
+        }
+      }
+      None => CharPos::default(),
+    };
+    Err(ParsingError { pos, message: RcString::from(message) })
   }
 
   pub fn parse_next_message(&mut self) -> Result<Option<ParsedMessage<'src>>, ParsingError> {
@@ -88,47 +113,44 @@ impl<'src> Parser<'src> {
       automatic_comments: Vec::new(),
       reference_comments: Vec::new(),
       flags_comments: Vec::new(),
-      prev_msgctxt: Vec::new(),
-      prev_msgid: Vec::new(),
-      msgctxt: Vec::new(),
-      msgid: Vec::new(),
-      msgstr: Vec::new(),
+      prev_msgctxt: None,
+      prev_msgid: None,
+      msgctxt: None,
+      msgid: Cow::Borrowed(""),
+      msgstr: Cow::Borrowed(""),
     };
 
     self.parse_comments_block(&mut message)?;
 
-    let mut has_prev_msgctxt = false;
     if let Some(TokenType::PrevMsgctxt) = self.peek_token()? {
       self.next_token()?;
-      self.parse_prev_string_list(&mut message.prev_msgctxt)?;
-      has_prev_msgctxt = true;
+      message.prev_msgctxt = Some(self.parse_prev_string_list()?);
     }
 
     if let Some(TokenType::PrevMsgid) = self.peek_token()? {
       self.next_token()?;
-      self.parse_prev_string_list(&mut message.prev_msgid)?;
-    } else if has_prev_msgctxt {
+      message.prev_msgid = Some(self.parse_prev_string_list()?);
+    } else if message.prev_msgctxt.is_some() {
       self.next_token()?;
       self.emit_error("expected prev_msgid".to_owned())?;
     }
 
-    let mut has_msgctxt = false;
     if let Some(TokenType::Msgctxt) = self.peek_token()? {
       self.next_token()?;
-      self.parse_string_list(&mut message.msgctxt)?;
-      has_msgctxt = true;
+      message.msgctxt = Some(self.parse_string_list()?);
     }
 
     if let Some(TokenType::Msgid) = self.next_token()? {
-      self.parse_string_list(&mut message.msgid)?;
+      message.msgid = self.parse_string_list()?;
     } else {
       self.emit_error(
-        if has_msgctxt { "expected msgid" } else { "expected msgid or msgctxt" }.to_owned(),
+        if message.msgctxt.is_some() { "expected msgid" } else { "expected msgid or msgctxt" }
+          .to_owned(),
       )?;
     }
 
     if let Some(TokenType::Msgstr) = self.next_token()? {
-      self.parse_string_list(&mut message.msgstr)?;
+      message.msgstr = self.parse_string_list()?;
     } else {
       self.emit_error("expected msgstr".to_owned())?;
     }
@@ -136,50 +158,59 @@ impl<'src> Parser<'src> {
     Ok(Some(message))
   }
 
-  fn parse_prev_string_list(&mut self, out: &mut Vec<Cow<'src, str>>) -> Result<(), ParsingError> {
-    let mut found_any_strings = false;
-    while self.peek_token()?.map_or(false, |t| matches!(t, TokenType::PrevString(..))) {
-      if let Some(TokenType::PrevString(text)) = self.next_token()? {
-        out.push(text);
-        found_any_strings = true;
-      }
+  fn parse_prev_string_list(&mut self) -> Result<Cow<'src, str>, ParsingError> {
+    let mut joined_text = None;
+    while let Some(TokenType::PrevString(text)) =
+      self.next_token_if(|t| matches!(t, TokenType::PrevString(..)))?
+    {
+      append_string_part(&mut joined_text, text);
     }
-    if !found_any_strings {
-      self.emit_error_after("expected one or more prev_strings".to_owned())?;
+    match joined_text {
+      Some(text) => Ok(text),
+      None => self.emit_error_after("expected one or more prev_strings".to_owned())?,
     }
-    Ok(())
   }
 
-  fn parse_string_list(&mut self, out: &mut Vec<Cow<'src, str>>) -> Result<(), ParsingError> {
-    let mut found_any_strings = false;
-    while self.peek_token()?.map_or(false, |t| matches!(t, TokenType::String(..))) {
-      if let Some(TokenType::String(text)) = self.next_token()? {
-        out.push(text);
-        found_any_strings = true;
-      }
+  fn parse_string_list(&mut self) -> Result<Cow<'src, str>, ParsingError> {
+    let mut joined_text = None;
+    while let Some(TokenType::String(text)) =
+      self.next_token_if(|t| matches!(t, TokenType::String(..)))?
+    {
+      append_string_part(&mut joined_text, text);
     }
-    if !found_any_strings {
-      self.emit_error_after("expected one or more strings".to_owned())?;
+    match joined_text {
+      Some(text) => Ok(text),
+      None => self.emit_error_after("expected one or more strings".to_owned())?,
     }
-    Ok(())
   }
 
   fn parse_comments_block(&mut self, out: &mut ParsedMessage<'src>) -> Result<(), ParsingError> {
-    while self.peek_token()?.map_or(false, |t| matches!(t, TokenType::Comment(..))) {
-      if let Some(TokenType::Comment(type_, text)) = self.next_token()? {
-        let list = match type_ {
-          CommentType::Translator => &mut out.translator_comments,
-          CommentType::Automatic => &mut out.automatic_comments,
-          CommentType::Reference => &mut out.reference_comments,
-          CommentType::Flags => &mut out.flags_comments,
-        };
-        list.push(text);
-      }
+    while let Some(TokenType::Comment(type_, text)) =
+      self.next_token_if(|t| matches!(t, TokenType::Comment(..)))?
+    {
+      let list = match type_ {
+        CommentType::Translator => &mut out.translator_comments,
+        CommentType::Automatic => &mut out.automatic_comments,
+        CommentType::Reference => &mut out.reference_comments,
+        CommentType::Flags => &mut out.flags_comments,
+      };
+      list.push(text);
     }
     Ok(())
   }
 }
 
+/// Joins the strings of a section as they are parsed. A section consisting of
+/// a single string (possibly preceded by an empty one, as is customary for
+/// multiline texts) remains borrowed from the source, otherwise the strings
+/// are accumulated in the first owned buffer.
+fn append_string_part<'src>(joined_text: &mut Option<Cow<'src, str>>, part: Cow<'src, str>) {
+  match joined_text {
+    Some(joined_text) if !joined_text.is_empty() => joined_text.to_mut().push_str(&part),
+    _ => *joined_text = Some(part),
+  }
+}
+
 impl<'src> Iterator for Parser<'src> {
   type Item = Result<ParsedMessage<'src>, ParsingError>;
 
@@ -242,8 +242,8 @@ impl Exporter for LocalizeMeTrPackExporter {
     let mut is_first_entry = true;
     for fragment in fragments {
       let translation_text = match &fragment.best_translation {
-        Some(tr) => tr.text.share_rc(),
-        None => RcString::from(""),
+        Some(tr) => tr.text.as_str(),
+        None => "",
       };
 
       let localize_me_file_path = localize_me::serialize_file_path(&fragment.file_path);
@@ -286,7 +286,7 @@ impl Exporter for LocalizeMeTrPackExporter {
           fmt.end_object_key(writer)?;
           fmt.begin_object_value(writer)?;
           {
-            json::format_escaped_str(writer, fmt, &translation_text)?;
+            json::format_escaped_str(writer, fmt, translation_text)?;
           }
           fmt.end_object_value(writer)?;
         }
@@ -347,9 +347,10 @@ impl Exporter for GettextPoExporter {
       if resplit_text.len() != 1 {
         writer.write_all(b"\"\"\n")?;
       }
+      let mut buf = String::new();
       for substr in resplit_text {
         writer.write_all(b"\"")?;
-        let mut buf = String::new();
+        buf.clear();
         gettext_po::escape_str(substr, &mut buf);
         writer.write_all(buf.as_bytes())?;
         writer.write_all(b"\"\n")?;
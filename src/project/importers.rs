@@ -3,7 +3,6 @@ use crate::gettext_po;
 use crate::impl_prelude::*;
 use crate::localize_me;
 use crate::rc_string::RcString;
-use crate::utils;
 use crate::utils::Timestamp;
 
 use once_cell::sync::Lazy;
@@ -264,9 +263,9 @@ impl Importer for GettextPoImporter {
           bail!("{}", e.nice_formatter(&file_path.file_name().unwrap().to_string_lossy(), input))
         }
       };
-      let msgctxt = utils::fast_concat_cow(&message.msgctxt);
-      let msgid = utils::fast_concat_cow(&message.msgid);
-      let msgstr = utils::fast_concat_cow(&message.msgstr);
+      let msgctxt = message.msgctxt.unwrap_or_default();
+      let msgid = message.msgid;
+      let msgstr = message.msgstr;
       if msgid.is_empty() || msgctxt.is_empty() {
         continue;
       }
@@ -347,6 +347,35 @@ mod tests {
     assert_eq!(split_filename_extension(".name.ext1.ext2"), (".name.ext1", Some("ext2")));
   }
 
+  #[test]
+  fn test_find_any_byte() {
+    use super::parsing::find_any_byte;
+    let haystack = b"0123456789abcdef\"quoted\\text\"\n";
+    for start in 0..haystack.len() {
+      let haystack = &haystack[start..];
+      for &needles in &[[b'"', b'\\', b'\n'], [b'x', b'y', b'z'], [b'0', b'f', b'q']] {
+        assert_eq!(
+          find_any_byte(haystack, needles),
+          haystack.iter().position(|b| needles.contains(b)),
+        );
+      }
+    }
+  }
+
+  #[test]
+  fn test_json_escaped_str() {
+    let text = "plain text, \"quotes\", back\\slashes,\ttabs\nand \u{1}controls\u{1f}, юникод\r\n";
+    for start in 0..text.len() {
+      let text = match text.get(start..) {
+        Some(v) => v,
+        None => continue,
+      };
+      let mut out = Vec::new();
+      json::format_escaped_str(&mut out, &mut serde_json::ser::CompactFormatter, text).unwrap();
+      assert_eq!(String::from_utf8(out).unwrap(), serde_json::to_string(text).unwrap());
+    }
+  }
+
   #[test]
   fn test_compact_uuid() {
     for _ in 1..1000 {
@@ -1,5 +1,6 @@
 use serde_json::ser::{CharEscape, Formatter};
 use std::borrow::Cow;
+use std::convert::TryInto;
 use std::fs;
 use std::io::{self, Write};
 use std::path::Path;
@@ -68,12 +69,15 @@ pub fn write_file<T: serde::Serialize>(
   value: &T,
   config: UltimateFormatterConfig,
 ) -> io::Result<()> {
-  let mut writer = io::BufWriter::new(fs::File::create(path)?);
+  // Serialize everything into memory first and then hand the whole buffer to
+  // the OS in one go instead of issuing a write syscall for every 8 KiB of
+  // output through a BufWriter.
+  let mut bytes = Vec::<u8>::new();
   let mut serializer =
-    serde_json::Serializer::with_formatter(&mut writer, UltimateFormatter::new(config));
+    serde_json::Serializer::with_formatter(&mut bytes, UltimateFormatter::new(config));
   value.serialize(&mut serializer)?;
-  writer.write_all(b"\n")?;
-  writer.flush()?;
+  bytes.push(b'\n');
+  fs::write(path, &bytes)?;
   Ok(())
 }
 
@@ -89,7 +93,39 @@ where
   Ok(())
 }
 
-/// Copied from <https://github.com/serde-rs/json/blob/9b64e0b17ca73e7fbecace37758ff19bc35dea05/src/ser.rs#L2077-L2143>.
+/// Finds the index of the first byte which must be escaped in a JSON string,
+/// that is a control character, a quote or a backslash. Works eight bytes at a
+/// time just like [`crate::utils::parsing::find_any_byte`], with the addition
+/// of the "has less than" trick from
+/// <https://graphics.stanford.edu/~seander/bithacks.html#HasLessInWord>.
+fn find_byte_to_escape(bytes: &[u8]) -> Option<usize> {
+  const WORD_SIZE: usize = std::mem::size_of::<u64>();
+  const LO_BITS: u64 = u64::from_ne_bytes([0x01; WORD_SIZE]);
+  const HI_BITS: u64 = u64::from_ne_bytes([0x80; WORD_SIZE]);
+
+  let mut chunks = bytes.chunks_exact(WORD_SIZE);
+  let mut offset = 0;
+  for chunk in &mut chunks {
+    let word = u64::from_le_bytes(chunk.try_into().unwrap());
+    let quotes = word ^ (LO_BITS * b'"' as u64);
+    let backslashes = word ^ (LO_BITS * b'\\' as u64);
+    let matches = (word.wrapping_sub(LO_BITS * 0x20) & !word & HI_BITS)
+      | (quotes.wrapping_sub(LO_BITS) & !quotes & HI_BITS)
+      | (backslashes.wrapping_sub(LO_BITS) & !backslashes & HI_BITS);
+    if matches != 0 {
+      // Same as in find_any_byte, the lowest set bit always marks a real match.
+      return Some(offset + matches.trailing_zeros() as usize / 8);
+    }
+    offset += WORD_SIZE;
+  }
+
+  let remainder = chunks.remainder();
+  remainder.iter().position(|&b| b < 0x20 || b == b'"' || b == b'\\').map(|i| offset + i)
+}
+
+/// Copied from <https://github.com/serde-rs/json/blob/9b64e0b17ca73e7fbecace37758ff19bc35dea05/src/ser.rs#L2077-L2143>,
+/// except that the bytes which don't need escaping are skipped with
+/// [`find_byte_to_escape`] instead of being checked one by one.
 pub fn format_escaped_str_contents<W, F>(
   writer: &mut W,
   formatter: &mut F,
@@ -103,11 +139,9 @@ where
 
   let mut start = 0;
 
-  for (i, &byte) in bytes.iter().enumerate() {
+  while let Some(i) = find_byte_to_escape(&bytes[start..]).map(|i| start + i) {
+    let byte = bytes[i];
     let escape = ESCAPE[byte as usize];
-    if escape == 0 {
-      continue;
-    }
 
     if start < i {
       formatter.write_string_fragment(writer, &value[start..i])?;
@@ -1,6 +1,7 @@
 use crate::impl_prelude::*;
 use crate::rc_string::RcString;
 
+use std::convert::TryInto;
 use std::fmt;
 use std::iter;
 use std::str;
@@ -14,6 +15,41 @@ pub struct CharPos {
   pub column: usize,
 }
 
+impl CharPos {
+  /// Computes the position of the character which begins at the given byte
+  /// index (or of the last character if the index is out of bounds). Only the
+  /// bytes before the index are looked at and line breaks are counted with
+  /// simple loops over those, which is cheaper than walking the string with
+  /// [`CharPosIter`], but this is still meant to be used only when an error has
+  /// to be reported.
+  pub fn find_in(string: &str, byte_index: usize) -> Self {
+    if byte_index >= string.len() {
+      return match string.char_indices().next_back() {
+        Some((last_char_index, _)) => Self::find_in(string, last_char_index),
+        None => Self::default(),
+      };
+    }
+
+    #[inline(always)]
+    fn count_chars(bytes: &[u8]) -> usize {
+      // Counts the bytes which are not UTF-8 continuation bytes.
+      bytes.iter().filter(|&&b| (b as i8) >= -0x40).count()
+    }
+
+    let before = &string.as_bytes()[..byte_index];
+    let (line, line_start_index) = match before.iter().rposition(|&b| b == b'\n') {
+      Some(i) => (before.iter().filter(|&&b| b == b'\n').count() + 1, i + 1),
+      None => (1, 0),
+    };
+    Self {
+      byte_index,
+      char_index: count_chars(before) + 1,
+      line,
+      column: count_chars(&before[line_start_index..]) + 1,
+    }
+  }
+}
+
 #[derive(Debug, Clone, PartialEq, Eq)]
 pub struct ParsingError {
   pub pos: CharPos,
@@ -157,3 +193,35 @@ impl iter::FusedIterator for CharPosIter<'_> {
 pub fn find_start_at<'a>(slice: &'a str, at: usize, pat: impl Pattern<'a>) -> Option<usize> {
   slice.get(at..)?.find(pat).map(|i| at + i)
 }
+
+/// Finds the index of the first byte in the slice which is equal to any of the
+/// needles. The bytes are checked eight at a time with the SWAR (SIMD Within A
+/// Register) trick described at
+/// <https://graphics.stanford.edu/~seander/bithacks.html#ValueInWord>, which is
+/// considerably faster than a plain loop for the long runs of literal text
+/// found in string literals and comments.
+pub fn find_any_byte<const N: usize>(haystack: &[u8], needles: [u8; N]) -> Option<usize> {
+  const WORD_SIZE: usize = std::mem::size_of::<u64>();
+  const LO_BITS: u64 = u64::from_ne_bytes([0x01; WORD_SIZE]);
+  const HI_BITS: u64 = u64::from_ne_bytes([0x80; WORD_SIZE]);
+
+  let mut chunks = haystack.chunks_exact(WORD_SIZE);
+  let mut offset = 0;
+  for chunk in &mut chunks {
+    let word = u64::from_le_bytes(chunk.try_into().unwrap());
+    let mut matches = 0;
+    for &needle in &needles {
+      let xored = word ^ (LO_BITS * needle as u64);
+      matches |= xored.wrapping_sub(LO_BITS) & !xored & HI_BITS;
+    }
+    if matches != 0 {
+      // The lowest set bit always marks a real match, the false positives
+      // caused by carries may only appear in the bytes above it.
+      return Some(offset + matches.trailing_zeros() as usize / 8);
+    }
+    offset += WORD_SIZE;
+  }
+
+  let remainder = chunks.remainder();
+  remainder.iter().position(|b| needles.contains(b)).map(|i| offset + i)
+}